@@ -0,0 +1,164 @@
+import csv
+import io
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MAX_CHUNK_BYTES = 1024 * 1024
+MAX_CHUNK_SECONDS = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkWriter:
+    """
+    Buffer CSV rows in memory and append them to disk in chunks.
+
+    A chunk is flushed once it holds `max_rows` rows, `max_bytes` bytes, or its oldest row
+    is `max_seconds` old, whichever comes first. Each flush is a single write followed by an
+    fsync; if it fails the file is truncated back to its previous size. A torn last line left
+    by a crash is dropped by `repair_torn_line`, which readers should call before parsing.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_rows: int,
+        max_bytes: int = MAX_CHUNK_BYTES,
+        max_seconds: float = MAX_CHUNK_SECONDS,
+    ):
+        self._path = path
+        self._max_rows = max_rows
+        self._max_bytes = max_bytes
+        self._max_seconds = max_seconds
+        self._fieldnames: Optional[List[str]] = None
+        self._buffer: List[str] = list()
+        self._buffer_bytes = 0
+        self._buffer_started: Optional[float] = None
+        self._fd: Optional[int] = None
+        self.rows_written = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # Don't retry a write on the way out of an error, it would mask the original exception
+        self.close(flush=exc_type is None)
+
+    def open(self) -> None:
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        _truncate_torn_line(self._fd, self._path)
+
+    def close(self, *, flush: bool = True) -> None:
+        if self._fd is None:
+            return
+        try:
+            if flush:
+                self.flush()
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def write(self, row: Dict) -> bool:
+        """ Buffer a row, and return True if it triggered a flush. """
+        if self._fieldnames is None:
+            self._fieldnames = list(row.keys())
+        if self._buffer_started is None:
+            self._buffer_started = time.monotonic()
+
+        line = self._render([row[name] for name in self._fieldnames])
+        self._buffer.append(line)
+        self._buffer_bytes += len(line.encode())
+
+        if self._should_flush():
+            self.flush()
+            return True
+        return False
+
+    def flush_if_stale(self) -> bool:
+        """ Flush if the oldest buffered row has been held for `max_seconds`, and return True if it did. """
+        if self._buffer and self._is_stale():
+            self.flush()
+            return True
+        return False
+
+    def flush(self) -> int:
+        """ Append the buffered rows to disk, and return the number of rows written. """
+        if not self._buffer:
+            return 0
+
+        lines = list(self._buffer)
+        original_size = os.fstat(self._fd).st_size
+        if original_size == 0:
+            lines.insert(0, self._render(self._fieldnames))
+        payload = "".join(lines).encode()
+
+        try:
+            written = 0
+            while written < len(payload):
+                written += os.write(self._fd, payload[written:])
+            os.fsync(self._fd)
+        except OSError:
+            os.ftruncate(self._fd, original_size)
+            raise
+
+        num_rows = len(self._buffer)
+        self.rows_written += num_rows
+        self._buffer = list()
+        self._buffer_bytes = 0
+        self._buffer_started = None
+        return num_rows
+
+    def _should_flush(self) -> bool:
+        return (
+            len(self._buffer) >= self._max_rows
+            or self._buffer_bytes >= self._max_bytes
+            or self._is_stale()
+        )
+
+    def _is_stale(self) -> bool:
+        return time.monotonic() - self._buffer_started >= self._max_seconds
+
+    @staticmethod
+    def _render(values: List) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(values)
+        return buffer.getvalue()
+
+
+def repair_torn_line(path: Path) -> None:
+    """ Drop a partially written last row left by a crash, so it is not read as a real row. """
+    if not path.exists():
+        return
+    fd = os.open(path, os.O_RDWR)
+    try:
+        _truncate_torn_line(fd, path)
+    finally:
+        os.close(fd)
+
+
+def _truncate_torn_line(fd: int, path: Path) -> None:
+    size = os.fstat(fd).st_size
+    if size == 0:
+        return
+    if os.pread(fd, 1, size - 1) == b"\n":
+        return
+
+    # Walk backwards in blocks until the last complete line is found
+    valid_size = 0
+    end = size
+    while end > 0:
+        start = max(end - io.DEFAULT_BUFFER_SIZE, 0)
+        newline = os.pread(fd, end - start, start).rfind(b"\n")
+        if newline != -1:
+            valid_size = start + newline + 1
+            break
+        end = start
+    logger.warning(
+        f"Dropping {size - valid_size} byte(s) of a partially written row in {path}."
+    )
+    os.ftruncate(fd, valid_size)
@@ -4,6 +4,7 @@ import logging
 from src.constants.registry import SERVICE_CENTER_REGISTRY
 from src.context import context
 from src.distribution import process_distribution
+from src.profiling import profile_pipeline
 from src.scraper import Scraper
 
 logger = logging.getLogger(__name__)
@@ -19,7 +20,10 @@ def main() -> None:
         setattr(context, k, v)
 
     pipeline = _PIPELINES_REGISTRY[context.pipeline]
-    pipeline()
+    if context.profile:
+        profile_pipeline(pipeline, name=context.pipeline)
+    else:
+        pipeline()
 
 
 def _parse_cli() -> argparse.Namespace:
@@ -41,6 +45,12 @@ def _parse_cli() -> argparse.Namespace:
         default=25,
         help="Number of forms to save to disk at a time.",
     )
+    parser.add_argument(
+        "--flush-interval",
+        type=float,
+        default=60.0,
+        help="Maximum number of seconds to hold scraped forms in memory before saving them to disk.",
+    )
     parser.add_argument(
         "-e",
         "--send_email",
@@ -48,6 +58,12 @@ def _parse_cli() -> argparse.Namespace:
         default=False,
         help="Decide whether to send email with your distribution plot.",
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help="Profile the pipeline and write reports to the profiles directory.",
+    )
 
     args = parser.parse_args()
     _check_args(args, parser)
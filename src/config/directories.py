@@ -9,6 +9,7 @@ class _Directories:
         self.package = self.project / "src"
         self.data = self.project / "data"
         self.output = self.project / "output"
+        self.profiles = self.project / "profiles"
         self.config = self.package / "config"
         self.images = self.package / "images"
         self.html = self.package / "html"
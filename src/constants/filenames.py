@@ -1,3 +1,6 @@
 DATASET = "data.csv"
 PNG_FILENAME = "{service_center_name}_processing_time.png"
 HTML_FILENAME = "{service_center_name}_processing_time.html"
+RETRY_QUEUE = "retry_queue.json"
+OCR_CONFIDENCE = "ocr_confidence.csv"
+PERCENTILE_TABLE = "percentile_table.json"
@@ -3,6 +3,7 @@ from typing import Optional, Set
 
 import pandas as pd
 
+from src.chunk_writer import repair_torn_line
 from src.config.directories import directories
 from src.constants import DATASET
 from src.form import I140Form
@@ -30,6 +31,7 @@ def process_service_center(row: pd.Series) -> pd.Series:
 
 
 def read_i140_forms_from_csv() -> Set[Optional[I140Form]]:
+    repair_torn_line(directories.data / DATASET)
     try:
         df = pd.read_csv(directories.data / DATASET)
         i140_data = process_forms_dataframe(df)
@@ -2,17 +2,23 @@ from src.constants import EMAIL_HTML_CONTENT
 from src.constants.registry import SERVICE_CENTER_REGISTRY
 from src.context import context
 from src.emailing.emailing import send_email
+from src.profiling import profile_stage
 
 
 def process_distribution() -> None:
     service_center = SERVICE_CENTER_REGISTRY[context.service_center]
 
-    service_center.plot_processing_times_distribution()
-    percentile_of_days_elapsed = service_center.get_percentile_of_days_elapsed()
+    with profile_stage("plot_distribution"):
+        service_center.plot_processing_times_distribution()
+    with profile_stage("percentile_of_days_elapsed"):
+        percentile_of_days_elapsed = service_center.get_percentile_of_days_elapsed()
+    with profile_stage("export_percentile_table"):
+        service_center.export_percentile_table()
     html_content = EMAIL_HTML_CONTENT.format(
         service_center_name=service_center.name,
         percentile_of_days_elapsed=percentile_of_days_elapsed,
     )
 
     if context.send_email:
-        send_email(html_content, service_center)
+        with profile_stage("send_email"):
+            send_email(html_content, service_center)
@@ -1,6 +1,8 @@
 import logging
+from typing import Optional, Tuple, Union
 
 import pytesseract
+from PIL import Image
 
 from src.config.directories import directories
 from src.dates import get_dates
@@ -12,11 +14,13 @@ CUSTOM_CONFIG = r"--oem 3 --psm 6"
 logger = logging.getLogger(__name__)
 
 
-def image_to_form(local_filename: str) -> I140Form:
+def image_to_form(
+    local_filename: str, *, config: str = CUSTOM_CONFIG, scale: int = 1
+) -> Tuple[Optional[I140Form], float]:
+    """ OCR a PNG and return the parsed form along with its mean word confidence. """
     try:
-        text = pytesseract.image_to_string(
-            str(directories.output / local_filename), config=CUSTOM_CONFIG
-        )
+        image = _load_image(local_filename, scale=scale)
+        text, confidence = _image_to_text_and_confidence(image, config=config)
 
         received_date, priority_date, notice_date = get_dates(text)
 
@@ -32,6 +36,48 @@ def image_to_form(local_filename: str) -> I140Form:
             if "LIN" in text
             else None,
         )
-        return form
+        return form, confidence
     except pytesseract.pytesseract.TesseractError as e:
         logger.error(f"{e} for file {local_filename}")
+        return None, 0.0
+    except OSError as e:
+        logger.error(f"{e} while opening {local_filename}")
+        return None, 0.0
+
+
+def _load_image(local_filename: str, *, scale: int) -> Union[str, Image.Image]:
+    """ Return the PNG path as-is for the first pass, or an upscaled copy for the retry pass. """
+    path = str(directories.output / local_filename)
+    if scale == 1:
+        return path
+    with Image.open(path) as image:
+        return image.resize((image.width * scale, image.height * scale), Image.LANCZOS)
+
+
+def _image_to_text_and_confidence(
+    image: Union[str, Image.Image], *, config: str
+) -> Tuple[str, float]:
+    """
+    Run tesseract once with both the txt and tsv renderers. The txt output is exactly what
+    `pytesseract.image_to_string` returns, and the tsv output gives per-word confidences.
+    """
+    with pytesseract.pytesseract.save(image) as (temp_name, input_filename):
+        pytesseract.pytesseract.run_tesseract(
+            input_filename,
+            temp_name,
+            extension="txt",
+            lang=None,
+            config=f"-c tessedit_create_tsv=1 {config.strip()}",
+        )
+        with open(f"{temp_name}.txt", encoding="utf-8") as fp:
+            text = fp.read()
+        with open(f"{temp_name}.tsv", encoding="utf-8") as fp:
+            data = pytesseract.pytesseract.file_to_dict(fp.read(), "\t", -1)
+
+    confidences = [
+        float(conf)
+        for word, conf in zip(data.get("text", list()), data.get("conf", list()))
+        if word.strip() and float(conf) >= 0
+    ]
+    mean_confidence = sum(confidences) / len(confidences) if confidences else 0.0
+    return text, mean_confidence
@@ -0,0 +1,63 @@
+"""
+Answer "what percentile am I at" from the artifact written by
+`ServiceCenter.export_percentile_table`, using the standard library only.
+
+Usage: python -m src.percentile_lookup <SERVICE_CENTER> <DAYS_ELAPSED> [WINDOW]
+"""
+import json
+import sys
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.config.directories import directories
+from src.constants import PERCENTILE_TABLE
+
+DEFAULT_WINDOW = "6M"
+
+
+def load_percentile_table(path: Optional[Path] = None) -> Dict[str, Dict[str, List[int]]]:
+    """ Return the sorted processing times per service center and window, re-reading the artifact when it changes. """
+    path = path or directories.data / PERCENTILE_TABLE
+    return _read_percentile_table(path, path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=8)
+def _read_percentile_table(path: Path, mtime_ns: int) -> Dict[str, Dict[str, List[int]]]:
+    with open(path) as fp:
+        table = json.load(fp)
+    return {name: entry["windows"] for name, entry in table.items()}
+
+
+def get_percentile_of_days(
+    service_center: str,
+    days: int,
+    *,
+    window: str = DEFAULT_WINDOW,
+    path: Optional[Path] = None,
+) -> float:
+    """ Mirror `scipy.stats.percentileofscore(kind="rank")` on a precomputed sorted array. """
+    processing_times = load_percentile_table(path)[service_center][window]
+    if not processing_times:
+        return float("nan")
+
+    left = bisect_left(processing_times, days)
+    right = bisect_right(processing_times, days)
+    percentile = (left + right + (1 if right > left else 0)) * 50.0 / len(processing_times)
+    return round(percentile, 2)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if len(args) not in (2, 3):
+        sys.exit(__doc__.strip())
+    window = args[2] if len(args) == 3 else DEFAULT_WINDOW
+    try:
+        print(get_percentile_of_days(args[0], int(args[1]), window=window))
+    except FileNotFoundError as e:
+        sys.exit(f"{e}, run the distribution pipeline first.")
+    except KeyError as e:
+        sys.exit(f"Unknown service center or window: {e}\n\n{__doc__.strip()}")
+    except ValueError as e:
+        sys.exit(f"{e}\n\n{__doc__.strip()}")
@@ -0,0 +1,95 @@
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List
+
+from src.config.directories import directories
+
+REPORT_LINES = 50
+TOP_ALLOCATIONS = 10
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageReport:
+    name: str
+    elapsed_seconds: float
+    current_bytes: int
+    peak_bytes: int
+    top_allocations: List[tracemalloc.Statistic]
+
+
+_stage_reports: List[StageReport] = list()
+
+
+@contextmanager
+def profile_stage(name: str):
+    """ Record wall time and tracemalloc peak memory of a pipeline stage. No-op unless profiling. """
+    if not tracemalloc.is_tracing():
+        yield
+        return
+
+    # reset_peak() only exists on Python 3.9+, before that the peak covers the whole run so far
+    if hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        top_allocations = tracemalloc.take_snapshot().statistics("lineno")
+        _stage_reports.append(
+            StageReport(
+                name=name,
+                elapsed_seconds=time.perf_counter() - start,
+                current_bytes=current,
+                peak_bytes=peak,
+                top_allocations=top_allocations[:TOP_ALLOCATIONS],
+            )
+        )
+
+
+def profile_pipeline(pipeline: Callable[[], None], *, name: str) -> None:
+    """ Run a pipeline under cProfile and tracemalloc, and write its reports to the profiles directory. """
+    _stage_reports.clear()
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    try:
+        profiler.runcall(pipeline)
+    finally:
+        tracemalloc.stop()
+        _write_reports(profiler, name=name)
+
+
+def _write_reports(profiler: cProfile.Profile, *, name: str) -> None:
+    filename = f"{name}_{datetime.now():%Y%m%d_%H%M%S}"
+    pstats_path = directories.profiles / f"{filename}.pstats"
+    report_path = directories.profiles / f"{filename}.txt"
+
+    profiler.dump_stats(pstats_path)
+
+    stream = io.StringIO()
+    stream.write(f"Pipeline: {name}\n\nStages:\n")
+    for stage in _stage_reports:
+        stream.write(
+            f"  {stage.name}: {stage.elapsed_seconds:.2f}s, "
+            f"peak {stage.peak_bytes / 2 ** 20:.1f} MiB, "
+            f"retained {stage.current_bytes / 2 ** 20:.1f} MiB\n"
+        )
+        for statistic in stage.top_allocations:
+            stream.write(f"    {statistic}\n")
+
+    stream.write("\nFunctions by cumulative time:\n")
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(
+        REPORT_LINES
+    )
+    report_path.write_text(stream.getvalue())
+
+    logger.info(f"Wrote profile report to {report_path} and stats to {pstats_path}.")
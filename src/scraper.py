@@ -1,15 +1,15 @@
 import datetime
 import logging
 import time
-from typing import Set, List, Iterable, Optional
+from typing import Set, Iterable
 from urllib.parse import urljoin
 
 import numpy as np
-import pandas as pd
 import requests
 from bs4 import BeautifulSoup
 from requests.exceptions import ReadTimeout, ConnectionError, ChunkedEncodingError
 
+from src.chunk_writer import ChunkWriter
 from src.config.directories import directories
 from src.constants import DATASET, URL_2019, URL_2020, URL_2021, URL_2022, URL_PRE_2019
 from src.context import context
@@ -26,6 +26,8 @@ from src.file_utils import (
 from src.form import I140Form
 from src.image_to_form import image_to_form
 from src.pdf_to_png import download_pdf_content_as_png
+from src.profiling import profile_stage
+from src.triage import RETRY_LADDER, TriageQueue, get_triage_reason
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +38,8 @@ class Scraper:
         self.i140_forms = set()
         self.form_urls = set()
         self.form_urls_to_scrape = set()
+        self.triage_queue = TriageQueue()
+        self.forms_left_in_initial_pass = 0
 
     def _populate_i140_forms_from_csv(self) -> None:
         self.i140_forms = read_i140_forms_from_csv()
@@ -104,36 +108,100 @@ class Scraper:
             logger.info(f"Downloaded {filename} as png.")
 
     def _generate_forms(self) -> Iterable:
+        """
+        Yield (form row, elapsed seconds) for every form processed. Forms that produce no row
+        yield None, so the caller can still enforce the time-based flush.
+        """
+        self.forms_left_in_initial_pass = len(self.form_urls_to_scrape)
         for form_url in self.form_urls_to_scrape:
+            self.forms_left_in_initial_pass -= 1
             start = time.time()
             pdf_filename = pdf_filename_from_url(form_url)
             png_filename = pdf_to_png_filename(pdf_filename)
-            form = image_to_form(png_filename)
-            if form not in self.i140_forms:
-                self.i140_forms.add(form)
-                end = time.time()
-                form_dict = form.as_dict() if form else None
-                yield form_dict, end - start
-                logger.info(f"Added form {form} to forms.")
+            if png_filename in self.triage_queue:
+                yield None, time.time() - start
+                continue
+            form, confidence = image_to_form(png_filename)
+            self.triage_queue.record_confidence(
+                png_filename, confidence, ocr_pass="initial"
+            )
+            reason = get_triage_reason(form, confidence)
+            if reason:
+                self.triage_queue.add(png_filename, reason, form, confidence)
+                yield None, time.time() - start
+                continue
+            if form in self.i140_forms:
+                yield None, time.time() - start
+                continue
+            self.i140_forms.add(form)
+            end = time.time()
+            yield form.as_dict(), end - start
+            logger.info(f"Added form {form} to forms.")
+
+        self.triage_queue.save()
+        yield from self._generate_retried_forms()
+
+    def _generate_retried_forms(self) -> Iterable:
+        # Forms written by an interrupted run can still be queued
+        filenames_in_csv = {form.filename for form in self.i140_forms if form}
+        for png_filename in self.triage_queue.filenames:
+            if png_filename in filenames_in_csv:
+                self.triage_queue.remove(png_filename)
+                yield None, 0.0
+                continue
+
+            attempts = self.triage_queue.get_attempts(png_filename)
+            start = time.time()
+            for config, scale in RETRY_LADDER[attempts:]:
+                form, confidence = image_to_form(png_filename, config=config, scale=scale)
+                attempts = self.triage_queue.record_attempt(png_filename)
+                self.triage_queue.record_confidence(
+                    png_filename, confidence, ocr_pass=f"retry_{attempts}"
+                )
+                reason = get_triage_reason(form, confidence)
+                if not reason:
+                    row = form.as_dict()
+                    break
+                self.triage_queue.add(png_filename, reason, form, confidence)
+                yield None, time.time() - start
+                start = time.time()
+            else:
+                logger.warning(
+                    f"Giving up on {png_filename} after {attempts} retries "
+                    f"({self.triage_queue.get_reason(png_filename)})."
+                )
+                # Fall back to an empty row so the form is not scraped again on the next run
+                row = self.triage_queue.get_best_row(png_filename) or I140Form(
+                    filename=png_filename,
+                    niw_flag=False,
+                    received_date=None,
+                    priority_date=None,
+                    notice_date=None,
+                    service_center=None,
+                ).as_dict()
+
+            self.triage_queue.remove(png_filename)
+            end = time.time()
+            yield row, end - start
+            logger.info(f"Added retried form {png_filename} to forms.")
 
     def _write_forms_to_csv(self, *, chunk_size: int) -> None:
-        chunk = list()
-        existing_rows = len(self.form_urls) - len(self.form_urls_to_scrape)
-        new_rows = 0
+        existing_rows = len(self.i140_forms)
         average_speed = list()
 
-        for idx, (form, elapsed_time) in enumerate(self._generate_forms()):
-            if form:
-                chunk.append(form)
-            if len(chunk) % chunk_size == 0 or idx == len(self.form_urls_to_scrape) - 1:
-                existing_rows += chunk_size
-                new_rows += chunk_size
-
-                self._write_chunk(chunk, existing_rows)
-                chunk = list()
-                remaining_forms = len(self.form_urls) - existing_rows
+        with ChunkWriter(
+            directories.data / DATASET,
+            max_rows=chunk_size,
+            max_seconds=context.flush_interval,
+        ) as writer:
+            for form, elapsed_time in self._generate_forms():
                 average_speed.append(elapsed_time)
+                flushed = writer.write(form) if form else writer.flush_if_stale()
+                if not flushed:
+                    continue
 
+                self._log_progress(existing_rows + writer.rows_written)
+                remaining_forms = self.forms_left_in_initial_pass + len(self.triage_queue)
                 logger.info(
                     "Estimated time left: {}".format(
                         datetime.timedelta(
@@ -142,27 +210,32 @@ class Scraper:
                     )
                 )
 
+        self._log_progress(existing_rows + writer.rows_written)
+
     def _is_empty_csv(self):
         return len(self.form_urls) == len(self.form_urls_to_scrape)
 
-    def _write_chunk(
-        self, chunk: List[Optional[I140Form]], num_existing_rows: int
-    ) -> None:
-        header = True if num_existing_rows == len(chunk) else False
-        pd.DataFrame(chunk).to_csv(
-            directories.data / DATASET, mode="a", header=header, index=False
-        )
+    def _log_progress(self, num_existing_rows: int) -> None:
         logger.info(
             "Wrote {num_existing_rows} out of {form_urls} rows to disk... {percent_complete:.3%} complete.".format(
                 num_existing_rows=num_existing_rows,
                 form_urls=len(self.form_urls),
-                percent_complete=num_existing_rows / len(self.form_urls),
+                percent_complete=num_existing_rows / max(len(self.form_urls), 1),
             )
         )
 
     def run(self):
-        self._populate_i140_forms_from_csv()
-        self._populate_form_urls()
-        self._download_png_files()
-        self._populate_form_urls_to_scrape()
-        self._write_forms_to_csv(chunk_size=context.chunk_size)
+        with profile_stage("read_csv"):
+            self._populate_i140_forms_from_csv()
+            self.triage_queue.load()
+        with profile_stage("populate_form_urls"):
+            self._populate_form_urls()
+        with profile_stage("download_png_files"):
+            self._download_png_files()
+        with profile_stage("populate_form_urls_to_scrape"):
+            self._populate_form_urls_to_scrape()
+        with profile_stage("write_forms_to_csv"):
+            try:
+                self._write_forms_to_csv(chunk_size=context.chunk_size)
+            finally:
+                self.triage_queue.save()
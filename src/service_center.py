@@ -1,4 +1,6 @@
+import json
 import logging
+import os
 from datetime import datetime
 from enum import Enum, auto
 
@@ -7,7 +9,13 @@ import plotly.express as px
 from scipy.stats import stats
 
 from src.config.directories import directories
-from src.constants import DATASET, HTML_FILENAME, PNG_FILENAME, APPLICATION_DATE
+from src.constants import (
+    DATASET,
+    HTML_FILENAME,
+    PNG_FILENAME,
+    APPLICATION_DATE,
+    PERCENTILE_TABLE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -110,7 +118,7 @@ class ServiceCenter:
         )
         fig.show()
 
-    def get_percentile_of_days_elapsed(self) -> float:
+    def _get_last_6_months_processing_times(self) -> pd.Series:
         if self._df_preprocessed is None:
             self._generate_preprocessed_forms_dataset()
         # Filter on last 6 months only
@@ -124,8 +132,10 @@ class ServiceCenter:
         df_6M = self._df_preprocessed.query(
             "(@today >= notice_date >= @last6)"
         ).reset_index(drop=True)
+        return df_6M["processing_time"]
 
-        processing_time_series = df_6M["processing_time"]
+    def get_percentile_of_days_elapsed(self) -> float:
+        processing_time_series = self._get_last_6_months_processing_times()
         percentile = round(
             stats.percentileofscore(
                 processing_time_series,
@@ -138,3 +148,39 @@ class ServiceCenter:
             f"Percentile of Days Elapsed Based on Last 6 Months of Chen Immigration I-140 NIW Data for {self._service_center.name}: {percentile}%"
         )
         return percentile
+
+    def export_percentile_table(self) -> None:
+        """
+        Write sorted processing times for the last 6 months and each notice year to a JSON
+        artifact, so percentile queries can be answered by `src.percentile_lookup`
+        without pandas or scipy.
+        """
+        windows = {
+            "6M": self._get_last_6_months_processing_times(),
+        }
+        for notice_year, processing_times in self._df_preprocessed.groupby(
+            "notice_year"
+        )["processing_time"]:
+            if 2017 <= notice_year <= CURRENT_YEAR:
+                windows[str(int(notice_year))] = processing_times
+
+        path = directories.data / PERCENTILE_TABLE
+        try:
+            with open(path) as fp:
+                table = json.load(fp)
+        except (FileNotFoundError, json.JSONDecodeError):
+            table = dict()
+
+        table[self._service_center.name] = {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "windows": {
+                window: sorted(int(days) for days in processing_times)
+                for window, processing_times in windows.items()
+            },
+        }
+
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, mode="w") as fp:
+            json.dump(table, fp, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        logger.info(f"Exported {self._service_center.name} percentile table to {path}.")
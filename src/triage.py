@@ -0,0 +1,134 @@
+import csv
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+from src.config.directories import directories
+from src.constants import OCR_CONFIDENCE, RETRY_QUEUE
+from src.form import I140Form
+
+# Expensive passes, tried in order until one parses cleanly: upscale the 200 DPI pdf2image
+# output, then fall back from a single column of text to fully automatic page segmentation
+RETRY_LADDER: List[Tuple[str, int]] = [
+    (r"--oem 3 --psm 4 --dpi 400", 2),
+    (r"--oem 3 --psm 3 --dpi 600", 3),
+]
+MIN_OCR_CONFIDENCE = 60.0
+
+logger = logging.getLogger(__name__)
+
+
+def get_triage_reason(form: Optional[I140Form], confidence: float) -> Optional[str]:
+    """ Return why a form should be retried, or None if it parsed cleanly. """
+    if form is None:
+        return "ocr_error"
+    if form.received_date is None and form.notice_date is None:
+        return "missing_dates"
+    if confidence < MIN_OCR_CONFIDENCE:
+        return "low_confidence"
+    return None
+
+
+def _result_score(form: Optional[I140Form], confidence: float) -> Tuple[bool, float]:
+    """ Rank OCR results: any result with dates beats one without, then by confidence. """
+    has_dates = form is not None and (
+        form.received_date is not None or form.notice_date is not None
+    )
+    return has_dates, confidence
+
+
+class TriageQueue:
+    """ Persistent queue of forms that need the expensive OCR pass. """
+
+    def __init__(self):
+        self._path = directories.data / RETRY_QUEUE
+        self._confidence_path = directories.data / OCR_CONFIDENCE
+        self._entries: Dict[str, Dict] = dict()
+        self._confidences: List[List] = list()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, filename: str):
+        return filename in self._entries
+
+    @property
+    def filenames(self) -> List[str]:
+        return list(self._entries)
+
+    def load(self) -> None:
+        try:
+            with open(self._path) as fp:
+                self._entries = json.load(fp)
+        except FileNotFoundError:
+            self._entries = dict()
+        except json.JSONDecodeError as e:
+            logger.warning(
+                f"{e} while reading {self._path}, starting with an empty retry queue."
+            )
+            self._entries = dict()
+        logger.info(f"Found {len(self._entries)} form(s) in the retry queue.")
+
+    def save(self) -> None:
+        tmp_path = self._path.with_suffix(".json.tmp")
+        with open(tmp_path, mode="w") as fp:
+            json.dump(self._entries, fp, indent=2, sort_keys=True)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_path, self._path)
+
+        if self._confidences:
+            write_header = not self._confidence_path.exists()
+            with open(self._confidence_path, mode="a", newline="") as fp:
+                writer = csv.writer(fp)
+                if write_header:
+                    writer.writerow(["filename", "ocr_pass", "confidence"])
+                writer.writerows(self._confidences)
+            self._confidences = list()
+
+    def record_confidence(self, filename: str, confidence: float, *, ocr_pass: str) -> None:
+        self._confidences.append([filename, ocr_pass, round(confidence, 2)])
+
+    def add(
+        self, filename: str, reason: str, form: Optional[I140Form], confidence: float
+    ) -> None:
+        """ Queue a form, keeping the best OCR result seen across passes. """
+        entry = self._entries.setdefault(filename, {"attempts": 0, "best": None})
+        entry["reason"] = reason
+        entry["confidence"] = round(confidence, 2)
+
+        best = entry.get("best")
+        score = _result_score(form, confidence)
+        if form is not None and (
+            best is None or score > (best["has_dates"], best["confidence"])
+        ):
+            entry["best"] = {
+                "has_dates": score[0],
+                "confidence": round(confidence, 2),
+                "row": {
+                    k: v if v is None or isinstance(v, (bool, str)) else str(v)
+                    for k, v in form.as_dict().items()
+                },
+            }
+        logger.info(f"Queued {filename} for retry ({reason}, confidence {confidence:.1f}).")
+
+    def remove(self, filename: str) -> None:
+        self._entries.pop(filename, None)
+
+    def get_reason(self, filename: str) -> str:
+        return self._entries[filename]["reason"]
+
+    def get_best_row(self, filename: str) -> Optional[Dict]:
+        """ Return the CSV row of the best OCR result recorded for a queued form. """
+        best = self._entries[filename].get("best")
+        return best["row"] if best else None
+
+    def get_attempts(self, filename: str) -> int:
+        return self._entries[filename]["attempts"]
+
+    def record_attempt(self, filename: str) -> int:
+        """ Increment and return the number of expensive passes run on a queued form. """
+        entry = self._entries[filename]
+        entry["attempts"] += 1
+        return entry["attempts"]